@@ -264,6 +264,8 @@ firewall:
 """
 
 from ansible.module_utils.basic import AnsibleModule
+from collections import OrderedDict
+from functools import partial
 import re
 import os
 
@@ -284,22 +286,21 @@ try:
 except ImportError:
     HAS_FIREWALLD = False
 
-try:
-    from firewall.core.fw_nm import (
-        nm_is_imported,
-        nm_get_connection_of_interface,
-        nm_get_zone_of_connection,
-        nm_set_zone_of_connection,
-        nm_get_interfaces,
-        nm_get_client,
-    )
-
-    NM_IMPORTED = nm_is_imported()
-except ImportError:
-    NM_IMPORTED = False
+# Loading the NetworkManager bindings is expensive and they are only
+# needed for interfaces, so they are imported by import_nm() on first use
+NM_IMPORTED = None
+nm_get_connection_of_interface = None
+nm_get_zone_of_connection = None
+nm_set_zone_of_connection = None
+nm_get_interfaces = None
+nm_get_client = None
 
 
 PCI_REGEX = re.compile("[0-9a-fA-F]{4}:[0-9a-fA-F]{4}")
+# <port>[-<port>]/<protocol>
+PORT_REGEX = re.compile("^([^/;]+)/([^/;]+)$")
+# <port>[-<port>]/<protocol>;[<to-port>];[<to-addr>]
+FORWARD_PORT_REGEX = re.compile("^([^/;]+)/([^/;]+);([^;]*);([^;]*)$")
 
 
 # NOTE: Because of PEP632, we cannot use distutils.
@@ -318,6 +319,26 @@ def lsr_parse_version(v_str):
     return v
 
 
+def import_nm():
+    global NM_IMPORTED, nm_get_connection_of_interface, nm_get_zone_of_connection
+    global nm_set_zone_of_connection, nm_get_interfaces, nm_get_client
+    if NM_IMPORTED is None:
+        try:
+            from firewall.core.fw_nm import (
+                nm_is_imported,
+                nm_get_connection_of_interface,
+                nm_get_zone_of_connection,
+                nm_set_zone_of_connection,
+                nm_get_interfaces,
+                nm_get_client,
+            )
+
+            NM_IMPORTED = nm_is_imported()
+        except ImportError:
+            NM_IMPORTED = False
+    return NM_IMPORTED
+
+
 def try_get_connection_of_interface(interface):
     try:
         return nm_get_connection_of_interface(interface)
@@ -326,7 +347,7 @@ def try_get_connection_of_interface(interface):
 
 
 def try_set_zone_of_interface(module, _zone, interface):
-    if NM_IMPORTED:
+    if import_nm():
         connection = try_get_connection_of_interface(interface)
         if connection is not None:
             if _zone == "":
@@ -415,6 +436,8 @@ pci_ids = None
 
 def get_interface_pci():
     pci_dict = {}
+    if not import_nm():
+        return pci_dict
     for interface in nm_get_interfaces():
         # udi/device/[vendor, device]
         interface_ids = []
@@ -451,10 +474,10 @@ def parse_pci_id(module, item):
 
 
 def parse_port(module, item):
-    _port, _protocol = item.split("/")
-    if _protocol is None:
+    match = PORT_REGEX.match(item)
+    if not match:
         module.fail_json(msg="improper port format (missing protocol?)")
-    return (_port, _protocol)
+    return match.groups()
 
 
 ipv4_charset = "0123456789./"
@@ -574,31 +597,29 @@ def parse_forward_port(module, item):
             )
         else:
             _protocol = item["proto"]
-        if "toport" in item:
-            _to_port = str(item["toport"])
-        else:
-            _to_port = None
+        _to_port = item.get("toport")
+        if _to_port is not None:
+            _to_port = str(_to_port)
         _to_addr = item.get("toaddr")
     elif isinstance(item, str):
-        args = item.split(";")
-        if len(args) == 3:
-            __port, _to_port, _to_addr = args
-        else:
+        match = FORWARD_PORT_REGEX.match(item)
+        if not match:
             module.fail_json(msg="improper %s format: %s" % (type_string, item))
-
-        _port, _protocol = __port.split("/")
-        if _protocol is None:
-            module.fail_json(msg="improper %s format (missing protocol?)" % type_string)
-        if _to_port == "":
-            _to_port = None
-        if _to_addr == "":
-            _to_addr = None
+        _port, _protocol, _to_port, _to_addr = match.groups()
     else:
         module.fail_json(
             msg="improper %s type (must be str or dict): %s" % (type_string, item)
         )
 
-    return (_port, _protocol, _to_port, _to_addr)
+    return normalize_zone_entry((_port, _protocol, _to_port, _to_addr))
+
+
+# Rich rules are compared in the canonical form firewalld reports them in
+def parse_rich_rule(module, item):
+    try:
+        return str(Rich_Rule(rule_str=item))
+    except Exception as e:
+        module.fail_json(msg="Rich Rule '%s' is not valid: %s" % (item, str(e)))
 
 
 def check_allow_zone_drifting(firewalld_conf):
@@ -615,10 +636,141 @@ def check_firewalld_conf(firewalld_conf):
     check_allow_zone_drifting(firewalld_conf)
 
 
+def exception_handler(module, exception_message):
+    module.fail_json(msg=exception_message)
+
+
 def set_the_default_zone(fw, set_default_zone):
     fw.setDefaultZone(set_default_zone)
 
 
+# Zone list parameters, the firewalld method suffix used to manage them and
+# whether the runtime add method takes a timeout. Interfaces are not in
+# here, they may be under control of NetworkManager and are handled in main
+ZONE_RESOURCES = (
+    ("service", "Service", True),
+    ("port", "Port", True),
+    ("source_port", "SourcePort", True),
+    ("forward_port", "ForwardPort", True),
+    ("rich_rule", "RichRule", True),
+    ("source", "Source", False),
+    ("icmp_block", "IcmpBlock", True),
+)
+
+
+# firewalld returns lists over D-Bus and tuples from zone settings, with
+# unset forward_port fields as empty strings. Parsed items and snapshot
+# entries both go through this, so they compare equal.
+def normalize_zone_entry(entry):
+    if isinstance(entry, (list, tuple)):
+        return tuple(field or None for field in entry)
+    return entry
+
+
+# Fetch the current runtime and permanent entries of one zone resource
+# Returns (runtime entries or None, permanent entries or None)
+def get_zone_entries(fw, fw_settings, zone, sides, suffix):
+    runtime, permanent = sides
+    getter = "get%ss" % suffix
+    rt_entries = None
+    perm_entries = None
+    if runtime:
+        rt_entries = frozenset(
+            normalize_zone_entry(entry) for entry in getattr(fw, getter)(zone)
+        )
+    if permanent:
+        perm_entries = frozenset(
+            normalize_zone_entry(entry) for entry in getattr(fw_settings, getter)()
+        )
+    return rt_entries, perm_entries
+
+
+# Fetch the current entries of each requested zone resource once, instead
+# of querying firewalld for every single item.
+# Returns {parameter: (runtime entries or None, permanent entries or None)}
+def get_zone_snapshot(fw, fw_settings, zone, sides, items):
+    snapshot = {}
+    for name, suffix, _with_timeout in ZONE_RESOURCES:
+        if items.get(name):
+            snapshot[name] = get_zone_entries(fw, fw_settings, zone, sides, suffix)
+    return snapshot
+
+
+# firewalld also matches items that are not in the snapshot as they are,
+# like a port inside a port range or a MAC source in lower case, so an item
+# missing from the snapshot is only treated as missing once firewalld says so
+def has_zone_entry(item, entries, query, *args):
+    return item in entries or bool(query(*args))
+
+
+# Zone list items are passed to the firewalld methods as arguments
+def zone_item_args(item):
+    return item if isinstance(item, tuple) else (item,)
+
+
+# Whether adding (enable) or removing the items would change anything.
+# Items in the snapshot settle this directly, the others are confirmed
+# with firewalld, see has_zone_entry()
+def zone_items_differ(items, entries, enable, query, *prefix):
+    if not enable and items & entries:
+        return True
+    return any(
+        bool(query(*(prefix + zone_item_args(item)))) != enable
+        for item in items - entries
+    )
+
+
+# Add (state enabled) or remove (state disabled) the items of one zone
+# resource, using the snapshot entries as the current state.
+# sides is (runtime, permanent) and resource is (suffix, with_timeout)
+# Returns whether the runtime and the permanent configuration changed
+def apply_zone_items(
+    module, fw, fw_settings, zone, state, timeout, sides, resource, items, current
+):
+    enable = state == "enabled"
+    runtime, permanent = sides
+    suffix, with_timeout = resource
+    rt_entries, perm_entries = current
+
+    query = "query" + suffix
+    rt_query = getattr(fw, query) if runtime else None
+    perm_query = getattr(fw_settings, query) if permanent else None
+
+    # check mode only needs to know whether any entry differs
+    if module.check_mode:
+        wanted = set(items)
+        return (
+            bool(runtime)
+            and zone_items_differ(wanted, rt_entries, enable, rt_query, zone),
+            bool(permanent)
+            and zone_items_differ(wanted, perm_entries, enable, perm_query),
+        )
+
+    action = ("add" if enable else "remove") + suffix
+    rt_action = getattr(fw, action) if runtime else None
+    rt_extra = (timeout,) if enable and with_timeout else ()
+    perm_action = getattr(fw_settings, action) if permanent else None
+
+    rt_changed = False
+    perm_changed = False
+    for item in items:
+        args = zone_item_args(item)
+        # missing entries need to be added, present ones removed
+        if (
+            runtime
+            and has_zone_entry(item, rt_entries, rt_query, zone, *args) != enable
+        ):
+            rt_action(zone, *(args + rt_extra))
+            rt_changed = True
+        if (
+            permanent
+            and has_zone_entry(item, perm_entries, perm_query, *args) != enable
+        ):
+            perm_action(*args)
+            perm_changed = True
+    return rt_changed, perm_changed
+
+
 def main():
     module = AnsibleModule(
         argument_spec=dict(
@@ -707,40 +859,27 @@ def main():
     firewalld_conf = module.params["firewalld_conf"]
     if firewalld_conf:
         check_firewalld_conf(firewalld_conf)
-        allow_zone_drifting_deprecated = lsr_parse_version(
-            FW_VERSION
-        ) >= lsr_parse_version("1.0.0")
-        if allow_zone_drifting_deprecated and firewalld_conf.get("allow_zone_drifting"):
-            module.warn(
-                "AllowZoneDrifting is deprecated in this version of firewalld and no longer supported"
-            )
-    else:
-        # CodeQL will produce an error without this line
-        allow_zone_drifting_deprecated = None
     service = module.params["service"]
     short = module.params["short"]
     description = module.params["description"]
     protocol = module.params["protocol"]
-    helper_module = []
-    for _module in module.params["helper_module"]:
-        helper_module.append(parse_helper_module(module, _module))
-    port = []
-    for port_proto in module.params["port"]:
-        port.append(parse_port(module, port_proto))
-    source_port = []
-    for port_proto in module.params["source_port"]:
-        source_port.append(parse_port(module, port_proto))
-    forward_port = []
-    for item in get_forward_port(module):
-        forward_port.append(parse_forward_port(module, item))
+    helper_module = [
+        parse_helper_module(module, _module)
+        for _module in module.params["helper_module"]
+    ]
+    port = [parse_port(module, port_proto) for port_proto in module.params["port"]]
+    source_port = [
+        parse_port(module, port_proto) for port_proto in module.params["source_port"]
+    ]
+    forward_port = [
+        parse_forward_port(module, item) for item in get_forward_port(module)
+    ]
     masquerade = module.params["masquerade"]
-    rich_rule = []
-    for item in module.params["rich_rule"]:
-        try:
-            rule = str(Rich_Rule(rule_str=item))
-            rich_rule.append(rule)
-        except Exception as e:
-            module.fail_json(msg="Rich Rule '%s' is not valid: %s" % (item, str(e)))
+    # identical rules are parsed only once
+    rich_rule = [
+        parse_rich_rule(module, item)
+        for item in OrderedDict.fromkeys(module.params["rich_rule"])
+    ]
     source = module.params["source"]
     destination_ipv4 = None
     destination_ipv6 = None
@@ -772,6 +911,16 @@ def main():
     runtime = module.params["runtime"]
     state = module.params["state"]
 
+    # Drop duplicate items, keeping the order they were given in
+    service = list(OrderedDict.fromkeys(service))
+    port = list(OrderedDict.fromkeys(port))
+    source_port = list(OrderedDict.fromkeys(source_port))
+    forward_port = list(OrderedDict.fromkeys(forward_port))
+    rich_rule = list(OrderedDict.fromkeys(rich_rule))
+    source = list(OrderedDict.fromkeys(source))
+    interface = list(OrderedDict.fromkeys(interface))
+    icmp_block = list(OrderedDict.fromkeys(icmp_block))
+
     # All options that require state to be set
     state_required = any(
         (
@@ -796,21 +945,8 @@ def main():
         and icmp_block_inversion is None
         and target is None
         and zone is None
-        and not any(
-            (
-                service,
-                port,
-                source_port,
-                forward_port,
-                rich_rule,
-                source,
-                interface,
-                icmp_block,
-                set_default_zone,
-                firewalld_conf,
-                ipset,
-            )
-        )
+        and not state_required
+        and not any((set_default_zone, firewalld_conf))
     ):
         module.fail_json(
             msg="One of service, port, source_port, forward_port, "
@@ -929,58 +1065,59 @@ def main():
     if firewalld_conf and not permanent:
         module.fail_json(msg="firewalld_conf can only be used with permanent")
 
-    # Parameter checks
-    if state == "disabled":
-        if timeout > 0:
-            module.fail_json(msg="timeout can not be used with state: disabled")
-        if masquerade:
-            module.fail_json(msg="masquerade can not be used with state: disabled")
-
-        if icmp_block_inversion:
-            module.fail_json(
-                msg="icmp_block_inversion can not be used with state: disabled"
-            )
-
-        # if target is not None:
-        #     module.fail_json(
-        #         msg="target can not be used with state: disabled"
-        #     )
-
-    if timeout > 0:
-        _timeout_ok = any(
-            (
-                masquerade,
-                service,
-                port,
-                source_port,
-                forward_port,
-                rich_rule,
-                icmp_block,
-            )
+    # Parameter checks, the first one that applies is reported
+    timeout_only = timeout > 0 and not any(
+        (
+            masquerade,
+            service,
+            port,
+            source_port,
+            forward_port,
+            rich_rule,
+            icmp_block,
         )
+    )
+    parameter_checks = (
+        (
+            state == "disabled" and timeout > 0,
+            "timeout can not be used with state: disabled",
+        ),
+        (
+            state == "disabled" and masquerade,
+            "masquerade can not be used with state: disabled",
+        ),
+        (
+            state == "disabled" and icmp_block_inversion,
+            "icmp_block_inversion can not be used with state: disabled",
+        ),
+        (
+            timeout_only and icmp_block_inversion is not None,
+            "timeout can not be used with icmp_block_inversion only",
+        ),
+        (timeout_only and source, "timeout can not be used with source only"),
+        (timeout_only and interface, "timeout can not be used with interface only"),
+        (
+            timeout_only and target is not None,
+            "timeout can not be used with target only",
+        ),
+        (source and permanent is None, "source cannot be set without permanent"),
+        (state is None and state_required, "Options invalid without state option set"),
+    )
+    for failed, msg in parameter_checks:
+        if failed:
+            module.fail_json(msg=msg)
 
-        if icmp_block_inversion is not None and not _timeout_ok:
-            module.fail_json(
-                msg="timeout can not be used with icmp_block_inversion only"
-            )
-
-        if len(source) > 0 and not _timeout_ok:
-            module.fail_json(msg="timeout can not be used with source only")
-
-        if len(interface) > 0 and not _timeout_ok:
-            module.fail_json(msg="timeout can not be used with interface only")
-
-        if target is not None and not _timeout_ok:
-            module.fail_json(msg="timeout can not be used with target only")
-
-    if len(source) > 0 and permanent is None:
-        module.fail_json(msg="source cannot be set without permanent")
-
-    if state is None and state_required:
-        module.fail_json(msg="Options invalid without state option set")
+    fw_version = lsr_parse_version(FW_VERSION)
 
-    if not HAS_FIREWALLD:
-        module.fail_json(msg="No firewalld")
+    if firewalld_conf:
+        allow_zone_drifting_deprecated = fw_version >= [1, 0, 0]
+        if allow_zone_drifting_deprecated and firewalld_conf.get("allow_zone_drifting"):
+            module.warn(
+                "AllowZoneDrifting is deprecated in this version of firewalld and no longer supported"
+            )
+    else:
+        # CodeQL will produce an error without this line
+        allow_zone_drifting_deprecated = None
 
     fw = FirewallClient()
 
@@ -992,7 +1129,7 @@ def main():
         permanent = True
 
         # Pre-run version checking
-        if lsr_parse_version(FW_VERSION) < lsr_parse_version("0.3.9"):
+        if fw_version < [0, 3, 9]:
             module.fail_json(
                 msg="Unsupported firewalld version %s" " requires >= 0.3.9" % FW_VERSION
             )
@@ -1011,18 +1148,16 @@ def main():
         fw.start()
     else:
         # Pre-run version checking
-        if lsr_parse_version(FW_VERSION) < lsr_parse_version("0.2.11"):
+        if fw_version < [0, 2, 11]:
             module.fail_json(
                 msg="Unsupported firewalld version %s, requires >= 0.2.11" % FW_VERSION
             )
 
         # Set exception handler
-        def exception_handler(exception_message):
-            module.fail_json(msg=exception_message)
-
-        fw.setExceptionHandler(exception_handler)
+        fw.setExceptionHandler(partial(exception_handler, module))
 
     # Get default zone, the permanent zone and settings
+    default_zone = None
     fw_zone = None
     fw_settings = None
     if fw_offline:
@@ -1037,26 +1172,28 @@ def main():
                 list(fw.config.get_zone_config(fw_zone))
             )
     else:
-        zone_exists = False
-        if runtime:
-            zone_exists = zone_exists or zone is None or zone in fw.getZones()
-            err_str = "Runtime"
-        if permanent:
-            zone_exists = (
-                zone_exists or zone is None or zone in fw.config().getZoneNames()
+        # if zone is None, we will use default zone which always exists
+        if zone is None:
+            zone_exists = True
+        else:
+            zone_exists = bool(
+                (runtime and zone in fw.getZones())
+                or (permanent and zone in fw.config().getZoneNames())
             )
-            err_str = "Permanent"
+        err_str = "Permanent" if permanent else "Runtime"
 
         if not zone_exists and not zone_operation:
             module.fail_json(msg="%s zone '%s' does not exist." % (err_str, zone))
         elif zone_exists:
-            zone = zone or fw.getDefaultZone()
+            if zone is None:
+                zone = default_zone = fw.getDefaultZone()
             fw_zone = fw.config().getZoneByName(zone)
             fw_settings = fw_zone.getSettings()
 
     # Firewall modification starts here
 
     changed = False
+    perm_changed = False
     need_reload = False
 
     # firewalld.conf
@@ -1089,10 +1226,27 @@ def main():
 
     # set default zone
     if set_default_zone:
-        if fw.getDefaultZone() != set_default_zone:
+        if default_zone is None:
+            default_zone = fw.getDefaultZone()
+        if default_zone != set_default_zone:
             set_the_default_zone(fw, set_default_zone)
             changed = True
 
+    # Error case handling for check mode
+    if module.check_mode and any(item.startswith("ipset:") for item in source):
+        ipset_names = fw.config().getIPSetNames()
+        _source = []
+        for item in source:
+            if item.startswith("ipset:") and item.split(":")[1] not in ipset_names:
+                module.warn(
+                    "%s does not exist - ensure it is defined in a previous task before running play outside check mode"
+                    % item
+                )
+                changed = True
+            else:
+                _source.append(item)
+        source = _source
+
     # service
     if service_operation and permanent:
         service_exists = service in fw.config().getServiceNames()
@@ -1147,30 +1301,26 @@ def main():
                         fw_service_settings.setDestination("ipv6", destination_ipv6)
                     changed = True
         if state == "absent" and service_exists:
-            if port:
-                for _port, _protocol in port:
-                    if fw_service_settings.queryPort(_port, _protocol):
-                        if not module.check_mode:
-                            fw_service_settings.removePort(_port, _protocol)
-                        changed = True
-            if source_port:
-                for _port, _protocol in source_port:
-                    if fw_service_settings.querySourcePort(_port, _protocol):
-                        if not module.check_mode:
-                            fw_service_settings.removeSourcePort(_port, _protocol)
-                        changed = True
-            if protocol:
-                for _protocol in protocol:
-                    if fw_service_settings.queryProtocol(_protocol):
-                        if not module.check_mode:
-                            fw_service_settings.removeProtocol(_protocol)
-                        changed = True
-            if helper_module:
-                for _module in helper_module:
-                    if fw_service_settings.queryModule(_module):
-                        if not module.check_mode:
-                            fw_service_settings.removeModule(_module)
-                        changed = True
+            for _port, _protocol in port:
+                if fw_service_settings.queryPort(_port, _protocol):
+                    if not module.check_mode:
+                        fw_service_settings.removePort(_port, _protocol)
+                    changed = True
+            for _port, _protocol in source_port:
+                if fw_service_settings.querySourcePort(_port, _protocol):
+                    if not module.check_mode:
+                        fw_service_settings.removeSourcePort(_port, _protocol)
+                    changed = True
+            for _protocol in protocol:
+                if fw_service_settings.queryProtocol(_protocol):
+                    if not module.check_mode:
+                        fw_service_settings.removeProtocol(_protocol)
+                    changed = True
+            for _module in helper_module:
+                if fw_service_settings.queryModule(_module):
+                    if not module.check_mode:
+                        fw_service_settings.removeModule(_module)
+                    changed = True
             if destination_ipv4:
                 if fw_service_settings.queryDestination("ipv4", destination_ipv4):
                     if not module.check_mode:
@@ -1200,35 +1350,21 @@ def main():
             if service_exists:
                 fw_service.update(fw_service_settings)
             need_reload = True
-    else:
+    elif service:
+        service_names = fw.config().getServiceNames()
+        _service = []
         for item in service:
-            service_exists = item in fw.config().getServiceNames()
-            if state == "enabled" and service_exists:
-                if runtime and not fw.queryService(zone, item):
-                    if not module.check_mode:
-                        fw.addService(zone, item, timeout)
-                    changed = True
-                if permanent and not fw_settings.queryService(item):
-                    if not module.check_mode:
-                        fw_settings.addService(item)
-                    changed = True
-            elif state == "disabled" and service_exists:
-                if runtime and fw.queryService(zone, item):
-                    if not module.check_mode:
-                        fw.removeService(zone, item)
-                if permanent and fw_settings.queryService(item):
-                    if not module.check_mode:
-                        fw_settings.removeService(item)
-                    changed = True
+            if item in service_names:
+                _service.append(item)
+            elif module.check_mode:
+                module.warn(
+                    "Service does not exist - "
+                    + item
+                    + ". Ensure that you define the service in the playbook before running it in diff mode"
+                )
             else:
-                if module.check_mode:
-                    module.warn(
-                        "Service does not exist - "
-                        + item
-                        + ". Ensure that you define the service in the playbook before running it in diff mode"
-                    )
-                else:
-                    module.fail_json(msg="INVALID SERVICE - " + item)
+                module.fail_json(msg="INVALID SERVICE - " + item)
+        service = _service
 
     # ipset operations
     if ipset_operation:
@@ -1260,17 +1396,21 @@ def main():
                 if not module.check_mode:
                     fw_ipset_settings.setShort(short)
                 changed = True
+            query_entry = fw_ipset_settings.queryEntry
+            add_entry = fw_ipset_settings.addEntry
             for entry in ipset_entries:
-                if not fw_ipset_settings.queryEntry(entry):
+                if not query_entry(entry):
                     if not module.check_mode:
-                        fw_ipset_settings.addEntry(entry)
+                        add_entry(entry)
                     changed = True
         elif ipset_exists:
             if ipset_entries:
+                query_entry = fw_ipset_settings.queryEntry
+                remove_entry = fw_ipset_settings.removeEntry
                 for entry in ipset_entries:
-                    if fw_ipset_settings.queryEntry(entry):
+                    if query_entry(entry):
                         if not module.check_mode:
-                            fw_ipset_settings.removeEntry(entry)
+                            remove_entry(entry)
                         changed = True
             else:
                 ipset_source_name = "ipset:%s" % ipset
@@ -1309,81 +1449,39 @@ def main():
                 fw_ipset.update(fw_ipset_settings)
             need_reload = True
 
-    # port
-    for _port, _protocol in port:
-        if state == "enabled":
-            if runtime and not fw.queryPort(zone, _port, _protocol):
-                if not module.check_mode:
-                    fw.addPort(zone, _port, _protocol, timeout)
-                changed = True
-            if permanent and not fw_settings.queryPort(_port, _protocol):
-                if not module.check_mode:
-                    fw_settings.addPort(_port, _protocol)
-                changed = True
-        elif state == "disabled":
-            if runtime and fw.queryPort(zone, _port, _protocol):
-                if not module.check_mode:
-                    fw.removePort(zone, _port, _protocol)
-                changed = True
-            if permanent and fw_settings.queryPort(_port, _protocol):
-                if not module.check_mode:
-                    fw_settings.removePort(_port, _protocol)
-                changed = True
-
-    # source_port
-    for _port, _protocol in source_port:
-        if state == "enabled":
-            if runtime and not fw.querySourcePort(zone, _port, _protocol):
-                if not module.check_mode:
-                    fw.addSourcePort(zone, _port, _protocol, timeout)
-                changed = True
-            if permanent and not fw_settings.querySourcePort(_port, _protocol):
-                if not module.check_mode:
-                    fw_settings.addSourcePort(_port, _protocol)
-                changed = True
-        elif state == "disabled":
-            if runtime and fw.querySourcePort(zone, _port, _protocol):
-                if not module.check_mode:
-                    fw.removeSourcePort(zone, _port, _protocol)
-                changed = True
-            if permanent and fw_settings.querySourcePort(_port, _protocol):
-                if not module.check_mode:
-                    fw_settings.removeSourcePort(_port, _protocol)
+    # service, port, source_port, forward_port, rich_rule, source, icmp_block
+    zone_items = dict(
+        service=service,
+        port=port,
+        source_port=source_port,
+        forward_port=forward_port,
+        rich_rule=rich_rule,
+        source=source,
+        icmp_block=icmp_block,
+    )
+    snapshot = {}
+    if state in ["enabled", "disabled"]:
+        snapshot = get_zone_snapshot(
+            fw, fw_settings, zone, (runtime, permanent), zone_items
+        )
+    for name, suffix, with_timeout in ZONE_RESOURCES:
+        if name in snapshot:
+            rt_changed, zone_perm_changed = apply_zone_items(
+                module,
+                fw,
+                fw_settings,
+                zone,
+                state,
+                timeout,
+                (runtime, permanent),
+                (suffix, with_timeout),
+                zone_items[name],
+                snapshot[name],
+            )
+            if rt_changed or zone_perm_changed:
                 changed = True
-
-    # forward_port
-    if len(forward_port) > 0:
-        for _port, _protocol, _to_port, _to_addr in forward_port:
-            if state == "enabled":
-                if runtime and not fw.queryForwardPort(
-                    zone, _port, _protocol, _to_port, _to_addr
-                ):
-                    if not module.check_mode:
-                        fw.addForwardPort(
-                            zone, _port, _protocol, _to_port, _to_addr, timeout
-                        )
-                    changed = True
-                if permanent and not fw_settings.queryForwardPort(
-                    _port, _protocol, _to_port, _to_addr
-                ):
-                    if not module.check_mode:
-                        fw_settings.addForwardPort(_port, _protocol, _to_port, _to_addr)
-                    changed = True
-            elif state == "disabled":
-                if runtime and fw.queryForwardPort(
-                    zone, _port, _protocol, _to_port, _to_addr
-                ):
-                    if not module.check_mode:
-                        fw.removeForwardPort(zone, _port, _protocol, _to_port, _to_addr)
-                    changed = True
-                if permanent and fw_settings.queryForwardPort(
-                    _port, _protocol, _to_port, _to_addr
-                ):
-                    if not module.check_mode:
-                        fw_settings.removeForwardPort(
-                            _port, _protocol, _to_port, _to_addr
-                        )
-                    changed = True
+            if zone_perm_changed:
+                perm_changed = True
 
     # masquerade
     if masquerade is not None:
@@ -1396,6 +1494,7 @@ def main():
                 if not module.check_mode:
                     fw_settings.addMasquerade()
                 changed = True
+                perm_changed = True
         else:
             if runtime and fw.queryMasquerade(zone):
                 if not module.check_mode:
@@ -1405,64 +1504,17 @@ def main():
                 if not module.check_mode:
                     fw_settings.removeMasquerade()
                 changed = True
-
-    # rich_rule
-    for item in rich_rule:
-        if state == "enabled":
-            if runtime and not fw.queryRichRule(zone, item):
-                if not module.check_mode:
-                    fw.addRichRule(zone, item, timeout)
-                changed = True
-            if permanent and not fw_settings.queryRichRule(item):
-                if not module.check_mode:
-                    fw_settings.addRichRule(item)
-                changed = True
-        elif state == "disabled":
-            if runtime and fw.queryRichRule(zone, item):
-                if not module.check_mode:
-                    fw.removeRichRule(zone, item)
-                changed = True
-            if permanent and fw_settings.queryRichRule(item):
-                if not module.check_mode:
-                    fw_settings.removeRichRule(item)
-                changed = True
-
-    # source
-    for item in source:
-        # Error case handling for check mode
-        if (
-            module.check_mode
-            and item.startswith("ipset:")
-            and item.split(":")[1] not in fw.config().getIPSetNames()
-        ):
-            module.warn(
-                "%s does not exist - ensure it is defined in a previous task before running play outside check mode"
-                % item
-            )
-            changed = True
-        elif state == "enabled":
-            if runtime and not fw.querySource(zone, item):
-                if not module.check_mode:
-                    fw.addSource(zone, item)
-                changed = True
-            if permanent and not fw_settings.querySource(item):
-                if not module.check_mode:
-                    fw_settings.addSource(item)
-                changed = True
-        elif state == "disabled":
-            if runtime and fw.querySource(zone, item):
-                if not module.check_mode:
-                    fw.removeSource(zone, item)
-                changed = True
-            if permanent and fw_settings.querySource(item):
-                if not module.check_mode:
-                    fw_settings.removeSource(item)
-                changed = True
+                perm_changed = True
 
     # interface
+    rt_interfaces = perm_interfaces = None
+    if interface and state in ["enabled", "disabled"]:
+        rt_interfaces, perm_interfaces = get_zone_entries(
+            fw, fw_settings, zone, (runtime, permanent), "Interface"
+        )
     for item in interface:
         if state == "enabled":
-            if runtime and not fw.queryInterface(zone, item):
+            if runtime and item not in rt_interfaces:
                 if not module.check_mode:
                     fw.changeZoneOfInterface(zone, item)
                 changed = True
@@ -1470,14 +1522,15 @@ def main():
                 nm_used, if_changed = try_set_zone_of_interface(module, zone, item)
                 if nm_used:
                     changed = if_changed
-                elif not fw_settings.queryInterface(item):
+                elif item not in perm_interfaces:
                     if not module.check_mode:
                         handle_interface_permanent(
                             zone, item, fw_zone, fw_settings, fw, fw_offline, module
                         )
                     changed = True
+                    perm_changed = True
         elif state == "disabled":
-            if runtime and fw.queryInterface(zone, item):
+            if runtime and item in rt_interfaces:
                 if not module.check_mode:
                     fw.removeInterface(zone, item)
                 changed = True
@@ -1485,31 +1538,11 @@ def main():
                 nm_used, if_changed = try_set_zone_of_interface(module, "", item)
                 if nm_used:
                     changed = if_changed
-                elif fw_settings.queryInterface(item):
+                elif item in perm_interfaces:
                     if not module.check_mode:
                         fw_settings.removeInterface(item)
                     changed = True
-
-    # icmp_block
-    for item in icmp_block:
-        if state == "enabled":
-            if runtime and not fw.queryIcmpBlock(zone, item):
-                if not module.check_mode:
-                    fw.addIcmpBlock(zone, item, timeout)
-                changed = True
-            if permanent and not fw_settings.queryIcmpBlock(item):
-                if not module.check_mode:
-                    fw_settings.addIcmpBlock(item)
-                changed = True
-        elif state == "disabled":
-            if runtime and fw.queryIcmpBlock(zone, item):
-                if not module.check_mode:
-                    fw.removeIcmpBlock(zone, item)
-                changed = True
-            if permanent and fw_settings.queryIcmpBlock(item):
-                if not module.check_mode:
-                    fw_settings.removeIcmpBlock(item)
-                changed = True
+                    perm_changed = True
 
     # icmp_block_inversion
     if icmp_block_inversion is not None:
@@ -1522,6 +1555,7 @@ def main():
                 if not module.check_mode:
                     fw_settings.addIcmpBlockInversion()
                 changed = True
+                perm_changed = True
         else:
             if runtime and fw.queryIcmpBlockInversion(zone):
                 if not module.check_mode:
@@ -1531,32 +1565,27 @@ def main():
                 if not module.check_mode:
                     fw_settings.removeIcmpBlockInversion()
                 changed = True
+                perm_changed = True
 
     # target
-    if target is not None:
-        if state in ["enabled", "present"]:
-            if permanent and fw_settings.getTarget() != target:
-                if not module.check_mode:
-                    fw_settings.setTarget(target)
-                    need_reload = True
-                changed = True
-        elif state in ["absent", "disabled"]:
+    if target is not None and state is not None:
+        if state in ["absent", "disabled"]:
             target = "default"
-            if permanent and fw_settings.getTarget() != target:
-                if not module.check_mode:
-                    fw_settings.setTarget(target)
-                    need_reload = True
-                changed = True
+        if permanent and fw_settings.getTarget() != target:
+            if not module.check_mode:
+                fw_settings.setTarget(target)
+                need_reload = True
+            changed = True
+            perm_changed = True
 
     # apply permanent changes
-    if changed and (zone_operation or permanent):
-        if fw_zone and fw_settings:
-            if fw_offline:
-                fw.config.set_zone_config(fw_zone, fw_settings.settings)
-            else:
-                fw_zone.update(fw_settings)
-        if need_reload:
-            fw.reload()
+    if perm_changed and fw_zone and fw_settings and not module.check_mode:
+        if fw_offline:
+            fw.config.set_zone_config(fw_zone, fw_settings.settings)
+        else:
+            fw_zone.update(fw_settings)
+    if need_reload:
+        fw.reload()
 
     if not module.params["__report_changed"]:
         changed = False
@@ -38,6 +38,7 @@ SERVICES_PRESENT = ["https", "ipsec", "ldaps"]
 TEST_DATA = {
     "Service": {
         "input": {"service": SERVICES_PRESENT},
+        "current": SERVICES_PRESENT,
         "enabled": {
             "expected": {
                 "runtime": [
@@ -55,6 +56,7 @@ TEST_DATA = {
     },
     "Port": {
         "input": {"port": ["8081/tcp", "161-162/udp"]},
+        "current": [["8081", "tcp"], ["161-162", "udp"]],
         "enabled": {
             "expected": {
                 "runtime": [
@@ -76,6 +78,7 @@ TEST_DATA = {
     },
     "SourcePort": {
         "input": {"source_port": ["8081/tcp", "161-162/udp"]},
+        "current": [["8081", "tcp"], ["161-162", "udp"]],
         "enabled": {
             "expected": {
                 "runtime": [
@@ -97,6 +100,10 @@ TEST_DATA = {
     },
     "ForwardPort": {
         "input": {"forward_port": ["8081/tcp;port;addr", "161-162/udp;port;addr"]},
+        "current": [
+            ["8081", "tcp", "port", "addr"],
+            ["161-162", "udp", "port", "addr"],
+        ],
         "enabled": {
             "expected": {
                 "runtime": [
@@ -131,6 +138,7 @@ TEST_DATA = {
     },
     "RichRule": {
         "input": {"rich_rule": ['rule protocol value="30" reject']},
+        "current": ['rule protocol value="30" accept'],
         "enabled": {
             "expected": {
                 "runtime": [call("default", 'rule protocol value="30" accept', 0)],
@@ -154,6 +162,7 @@ TEST_DATA = {
         "input": {
             "source": ["192.0.2.0/24"],
         },
+        "current": ["192.0.2.0/24"],
         "enabled": {
             "expected": {
                 "runtime": [call("default", "192.0.2.0/24")],
@@ -171,6 +180,7 @@ TEST_DATA = {
         "input": {
             "interface": ["eth2"],
         },
+        "current": ["eth2"],
         "enabled": {
             "expected": {
                 "runtime": [call("default", "eth2")],
@@ -201,6 +211,7 @@ TEST_DATA = {
         "input": {
             "icmp_block": ["echo-request"],
         },
+        "current": ["echo-request"],
         "enabled": {
             "expected": {
                 "runtime": [call("default", "echo-request", 0)],
@@ -399,6 +410,10 @@ class FirewallInterfaceTests(unittest.TestCase):
 
         assert result == (False, False)
 
+    @patch("firewall_lib.NM_IMPORTED", False)
+    def test_get_interface_pci_nm_not_imported(self):
+        assert firewall_lib.get_interface_pci() == {}
+
 
 class FirewallLibParsers(unittest.TestCase):
     """test param to profile conversion and vice versa"""
@@ -426,6 +441,13 @@ class FirewallLibParsers(unittest.TestCase):
         item = "a/b"
         rc = firewall_lib.parse_port(module, item)
         self.assertEqual(("a", "b"), rc)
+        module.fail_json = Mock(side_effect=MockException())
+        for item in ["8081", "8081/tcp/udp", "/tcp"]:
+            with self.assertRaises(MockException):
+                firewall_lib.parse_port(module, item)
+            module.fail_json.assert_called_with(
+                msg="improper port format (missing protocol?)"
+            )
 
     def test_parse_forward_port(self):
         """Test the code that parses port values."""
@@ -439,6 +461,41 @@ class FirewallLibParsers(unittest.TestCase):
         item = "a/b;;"
         rc = firewall_lib.parse_forward_port(module, item)
         self.assertEqual(("a", "b", None, None), rc)
+        item = "8081/tcp;8082;192.0.2.1"
+        rc = firewall_lib.parse_forward_port(module, item)
+        self.assertEqual(("8081", "tcp", "8082", "192.0.2.1"), rc)
+        item = {"port": 8081, "proto": "tcp", "toport": 8082, "toaddr": ""}
+        rc = firewall_lib.parse_forward_port(module, item)
+        self.assertEqual(("8081", "tcp", "8082", None), rc)
+        item = {"port": "8081", "proto": "tcp", "toport": None}
+        rc = firewall_lib.parse_forward_port(module, item)
+        self.assertEqual(("8081", "tcp", None, None), rc)
+        for item in ["8081;8082;192.0.2.1", "8081/tcp;8082", "8081/tcp;;;"]:
+            with self.assertRaises(MockException):
+                firewall_lib.parse_forward_port(module, item)
+            module.fail_json.assert_called_with(
+                msg="improper forward_port format: %s" % item
+            )
+
+    @patch("firewall_lib.Rich_Rule", create=True)
+    def test_parse_rich_rule(self, rich_rule):
+        """Test the code that parses rich rules."""
+
+        module = Mock()
+        module.fail_json = Mock(side_effect=MockException())
+        rich_rule.return_value.__str__ = Mock(
+            return_value='rule service name="ssh" accept'
+        )
+        rc = firewall_lib.parse_rich_rule(module, "rule service name=ssh accept")
+        self.assertEqual('rule service name="ssh" accept', rc)
+        rich_rule.assert_called_with(rule_str="rule service name=ssh accept")
+
+        rich_rule.side_effect = Exception("bad rule")
+        with self.assertRaises(MockException):
+            firewall_lib.parse_rich_rule(module, "rule")
+        module.fail_json.assert_called_with(
+            msg="Rich Rule 'rule' is not valid: bad rule"
+        )
 
     @patch("firewall_lib.AnsibleModule", new_callable=MockAnsibleModule)
     @patch("firewall_lib.HAS_FIREWALLD", True)
@@ -459,6 +516,42 @@ class FirewallLibParsers(unittest.TestCase):
         am.fail_json.assert_called_with(msg="Options invalid without state option set")
 
 
+class FirewallZoneSnapshotTest(unittest.TestCase):
+    """test reading the current zone entries"""
+
+    def test_get_zone_snapshot(self):
+        fw = Mock()
+        fw.getForwardPorts.return_value = [["8081", "tcp", "", "192.0.2.1"]]
+        fw_settings = Mock()
+        fw_settings.getForwardPorts.return_value = [("8081", "tcp", "8082", "")]
+        fw_settings.getServices.return_value = ["https"]
+
+        snapshot = firewall_lib.get_zone_snapshot(
+            fw,
+            fw_settings,
+            "public",
+            (True, True),
+            {"forward_port": [("8081", "tcp", None, None)], "port": []},
+        )
+
+        assert snapshot == {
+            "forward_port": (
+                set([("8081", "tcp", None, "192.0.2.1")]),
+                set([("8081", "tcp", "8082", None)]),
+            )
+        }
+        fw.getForwardPorts.assert_called_once_with("public")
+        fw.getPorts.assert_not_called()
+        fw_settings.getPorts.assert_not_called()
+
+        snapshot = firewall_lib.get_zone_snapshot(
+            fw, fw_settings, "public", (False, True), {"service": ["https"]}
+        )
+
+        assert snapshot == {"service": (None, set(["https"]))}
+        fw.getServices.assert_not_called()
+
+
 @patch("firewall_lib.AnsibleModule", new_callable=MockAnsibleModule)
 class FirewallLibMain(unittest.TestCase):
     """Test main function."""
@@ -708,6 +801,42 @@ class FirewallLibMain(unittest.TestCase):
         firewall_lib.set_the_default_zone()
         firewall_lib.set_the_default_zone.assert_called()
 
+    @patch("firewall_lib.HAS_FIREWALLD", True)
+    @patch("firewall_lib.FW_VERSION", "0.9.0", create=True)
+    @patch("firewall_lib.FirewallClient", create=True)
+    def test_main_zone_does_not_exist(self, fw_class, am_class):
+        am = am_class.return_value
+        am.params = {"zone": "custom", "masquerade": True}
+        fw = fw_class.return_value
+        fw.getZones.return_value = ["public"]
+        with self.assertRaises(MockException):
+            firewall_lib.main()
+        am.fail_json.assert_called_with(msg="Runtime zone 'custom' does not exist.")
+        fw.getZones.assert_called_once_with()
+        fw.config.return_value.getZoneNames.assert_not_called()
+
+        am.params["permanent"] = True
+        fw.config.return_value.getZoneNames.return_value = ["public"]
+        with self.assertRaises(MockException):
+            firewall_lib.main()
+        am.fail_json.assert_called_with(msg="Permanent zone 'custom' does not exist.")
+        fw.config.return_value.getZoneNames.assert_called_once_with()
+
+    @patch("firewall_lib.HAS_FIREWALLD", True)
+    @patch("firewall_lib.FW_VERSION", "0.9.0", create=True)
+    @patch("firewall_lib.FirewallClient", create=True)
+    def test_main_default_zone_read_once(self, fw_class, am_class):
+        am = am_class.return_value
+        am.params = {"masquerade": True, "set_default_zone": "public"}
+        fw = fw_class.return_value
+        fw.getDefaultZone.return_value = "public"
+        fw.queryMasquerade.return_value = True
+        firewall_lib.main()
+        fw.getZones.assert_not_called()
+        fw.getDefaultZone.assert_called_once_with()
+        fw.setDefaultZone.assert_not_called()
+        am.exit_json.assert_called_with(changed=False, __firewall_changed=False)
+
     @patch("firewall_lib.HAS_FIREWALLD", True)
     @patch("firewall_lib.FW_VERSION", "0.3.8", create=True)
     @patch("firewall_lib.FirewallClient", create=True)
@@ -739,6 +868,264 @@ class FirewallLibMain(unittest.TestCase):
             + " Ensure that you define the service in the playbook before running it in diff mode"
         )
 
+    @patch("firewall_lib.HAS_FIREWALLD", True)
+    @patch("firewall_lib.FW_VERSION", "0.9.0", create=True)
+    @patch("firewall_lib.FirewallClient", create=True)
+    def test_main_disable_runtime_service(self, fw_class, am_class):
+        am = am_class.return_value
+        am.params = {
+            "service": ["https", "ldaps"],
+            "state": "disabled",
+        }
+        fw = fw_class.return_value
+        fw.getDefaultZone.return_value = "public"
+        fw.config.return_value.getServiceNames.return_value = SERVICES_PRESENT
+        fw.getServices.return_value = ["https"]
+        fw.queryService.return_value = False
+        firewall_lib.main()
+        fw.getServices.assert_called_once_with("public")
+        assert [call("public", "https")] == fw.removeService.call_args_list
+        am.exit_json.assert_called_once_with(changed=True, __firewall_changed=True)
+
+    @patch("firewall_lib.HAS_FIREWALLD", True)
+    @patch("firewall_lib.FW_VERSION", "0.9.0", create=True)
+    @patch("firewall_lib.FirewallClient", create=True)
+    def test_main_duplicate_items(self, fw_class, am_class):
+        am = am_class.return_value
+        am.params = {
+            "port": ["8081/tcp", "161-162/udp", "8081/tcp"],
+            "state": "enabled",
+        }
+        fw = fw_class.return_value
+        fw.getDefaultZone.return_value = "public"
+        fw.getPorts.return_value = []
+        fw.queryPort.return_value = False
+        firewall_lib.main()
+        assert [
+            call("public", "8081", "tcp", 0),
+            call("public", "161-162", "udp", 0),
+        ] == fw.addPort.call_args_list
+
+    @patch("firewall_lib.HAS_FIREWALLD", True)
+    @patch("firewall_lib.FW_VERSION", "0.9.0", create=True)
+    @patch("firewall_lib.FirewallClient", create=True)
+    def test_main_update_permanent_zone_only_on_change(self, fw_class, am_class):
+        am = am_class.return_value
+        am.params = {
+            "port": ["8081/tcp"],
+            "state": "enabled",
+            "permanent": True,
+            "runtime": True,
+        }
+        fw = fw_class.return_value
+        fw.getPorts.return_value = []
+        fw.queryPort.return_value = False
+        fw_zone = fw.config.return_value.getZoneByName.return_value
+        fw_settings = fw_zone.getSettings.return_value
+        fw_settings.getPorts.return_value = [("8081", "tcp")]
+        fw_settings.queryPort.return_value = False
+
+        firewall_lib.main()
+        fw.addPort.assert_called_once()
+        fw_settings.addPort.assert_not_called()
+        fw_zone.update.assert_not_called()
+        am.exit_json.assert_called_with(changed=True, __firewall_changed=True)
+
+        fw_settings.getPorts.return_value = []
+        firewall_lib.main()
+        fw_settings.addPort.assert_called_once_with("8081", "tcp")
+        fw_zone.update.assert_called_once_with(fw_settings)
+
+    @patch("firewall_lib.HAS_FIREWALLD", True)
+    @patch("firewall_lib.FW_VERSION", "0.9.0", create=True)
+    @patch("firewall_lib.FirewallClient", create=True)
+    def test_main_permanent_only_source(self, fw_class, am_class):
+        am = am_class.return_value
+        am.params = {
+            "source": ["192.0.2.0/24"],
+            "permanent": True,
+            "runtime": False,
+        }
+        fw = fw_class.return_value
+        fw_settings = fw.config.return_value.getZoneByName.return_value.getSettings()
+        fw_settings.querySource.return_value = False
+        for state in ["enabled", "disabled"]:
+            am.params["state"] = state
+            fw_settings.getSources.return_value = (
+                [] if state == "enabled" else ["192.0.2.0/24"]
+            )
+            firewall_lib.main()
+            am.exit_json.assert_called_with(changed=True, __firewall_changed=True)
+        fw_settings.addSource.assert_called_once_with("192.0.2.0/24")
+        fw_settings.removeSource.assert_called_once_with("192.0.2.0/24")
+        fw.getSources.assert_not_called()
+        fw.querySource.assert_not_called()
+        fw.addSource.assert_not_called()
+        fw.removeSource.assert_not_called()
+
+    @patch("firewall_lib.HAS_FIREWALLD", True)
+    @patch("firewall_lib.FW_VERSION", "0.9.0", create=True)
+    @patch("firewall_lib.FirewallClient", create=True)
+    def test_main_port_inside_range(self, fw_class, am_class):
+        am = am_class.return_value
+        am.params = {
+            "port": ["8081/tcp"],
+            "state": "enabled",
+            "permanent": True,
+            "runtime": True,
+        }
+        fw = fw_class.return_value
+        fw.getDefaultZone.return_value = "default"
+        fw.getPorts.return_value = [["8080-8090", "tcp"]]
+        fw.queryPort.return_value = True
+        fw_zone = fw.config.return_value.getZoneByName.return_value
+        fw_settings = fw_zone.getSettings.return_value
+        fw_settings.getPorts.return_value = [("8080-8090", "tcp")]
+        fw_settings.queryPort.return_value = True
+
+        firewall_lib.main()
+        fw.queryPort.assert_called_once_with("default", "8081", "tcp")
+        fw_settings.queryPort.assert_called_once_with("8081", "tcp")
+        fw.addPort.assert_not_called()
+        fw_settings.addPort.assert_not_called()
+        fw_zone.update.assert_not_called()
+        am.exit_json.assert_called_with(changed=False, __firewall_changed=False)
+
+        am.params["state"] = "disabled"
+        firewall_lib.main()
+        fw.removePort.assert_called_once_with("default", "8081", "tcp")
+        fw_settings.removePort.assert_called_once_with("8081", "tcp")
+        am.exit_json.assert_called_with(changed=True, __firewall_changed=True)
+
+    @patch("firewall_lib.HAS_FIREWALLD", True)
+    @patch("firewall_lib.FW_VERSION", "0.9.0", create=True)
+    @patch("firewall_lib.FirewallClient", create=True)
+    def test_main_lower_case_mac_source(self, fw_class, am_class):
+        am = am_class.return_value
+        am.params = {
+            "source": ["aa:bb:cc:dd:ee:ff"],
+            "state": "enabled",
+            "permanent": True,
+            "runtime": True,
+        }
+        fw = fw_class.return_value
+        fw.getDefaultZone.return_value = "default"
+        fw.getSources.return_value = ["AA:BB:CC:DD:EE:FF"]
+        fw.querySource.return_value = True
+        fw_zone = fw.config.return_value.getZoneByName.return_value
+        fw_settings = fw_zone.getSettings.return_value
+        fw_settings.getSources.return_value = ["AA:BB:CC:DD:EE:FF"]
+        fw_settings.querySource.return_value = True
+
+        firewall_lib.main()
+        fw.querySource.assert_called_once_with("default", "aa:bb:cc:dd:ee:ff")
+        fw_settings.querySource.assert_called_once_with("aa:bb:cc:dd:ee:ff")
+        fw.addSource.assert_not_called()
+        fw_settings.addSource.assert_not_called()
+        am.exit_json.assert_called_with(changed=False, __firewall_changed=False)
+
+    @patch("firewall_lib.HAS_FIREWALLD", True)
+    @patch("firewall_lib.FW_VERSION", "0.9.0", create=True)
+    @patch("firewall_lib.FirewallClient", create=True)
+    @patch("firewall_lib.Rich_Rule", create=True)
+    def test_main_duplicate_rich_rules(self, rich_rule, fw_class, am_class):
+        am = am_class.return_value
+        am.params = {
+            "rich_rule": [
+                "rule service name=ssh accept",
+                'rule service name="ssh" accept',
+                "rule service name=ssh accept",
+            ],
+            "state": "enabled",
+        }
+        rich_rule.return_value.__str__ = Mock(
+            return_value='rule service name="ssh" accept'
+        )
+        fw = fw_class.return_value
+        fw.getDefaultZone.return_value = "public"
+        fw.getRichRules.return_value = []
+        fw.queryRichRule.return_value = False
+        firewall_lib.main()
+        assert [
+            call(rule_str="rule service name=ssh accept"),
+            call(rule_str='rule service name="ssh" accept'),
+        ] == rich_rule.call_args_list
+        fw.addRichRule.assert_called_once_with(
+            "public", 'rule service name="ssh" accept', 0
+        )
+
+    @patch("firewall_lib.HAS_FIREWALLD", True)
+    @patch("firewall_lib.FW_VERSION", "0.9.0", create=True)
+    @patch("firewall_lib.FirewallClient", create=True)
+    def test_main_check_mode_ports(self, fw_class, am_class):
+        am = am_class.return_value
+        am.params = {
+            "port": ["8081/tcp", "161-162/udp"],
+            "state": "enabled",
+            "permanent": True,
+            "runtime": True,
+        }
+        am.check_mode = True
+        fw = fw_class.return_value
+        fw.getPorts.return_value = [["8081", "tcp"], ["161-162", "udp"]]
+        fw_settings = fw.config.return_value.getZoneByName.return_value.getSettings()
+        fw_settings.getPorts.return_value = [("8081", "tcp")]
+        fw.queryPort.return_value = False
+        fw_settings.queryPort.return_value = False
+
+        firewall_lib.main()
+        am.exit_json.assert_called_with(changed=True, __firewall_changed=True)
+        fw_settings.queryPort.assert_called_once_with("161-162", "udp")
+
+        fw_settings.getPorts.return_value.append(("161-162", "udp"))
+        firewall_lib.main()
+        am.exit_json.assert_called_with(changed=False, __firewall_changed=False)
+
+        am.params["state"] = "disabled"
+        fw.getPorts.return_value = []
+        fw_settings.getPorts.return_value = []
+        firewall_lib.main()
+        am.exit_json.assert_called_with(changed=False, __firewall_changed=False)
+
+        fw.addPort.assert_not_called()
+        fw_settings.addPort.assert_not_called()
+        fw.removePort.assert_not_called()
+        fw_settings.removePort.assert_not_called()
+
+    @patch("firewall_lib.HAS_FIREWALLD", True)
+    @patch("firewall_lib.FW_VERSION", "0.9.0", create=True)
+    @patch("firewall_lib.FirewallClient", create=True)
+    def test_main_check_mode_port_inside_range(self, fw_class, am_class):
+        am = am_class.return_value
+        am.params = {
+            "port": ["8081/tcp"],
+            "state": "enabled",
+            "permanent": True,
+            "runtime": True,
+        }
+        am.check_mode = True
+        fw = fw_class.return_value
+        fw.getDefaultZone.return_value = "default"
+        fw.getPorts.return_value = [["8080-8090", "tcp"]]
+        fw.queryPort.return_value = True
+        fw_settings = fw.config.return_value.getZoneByName.return_value.getSettings()
+        fw_settings.getPorts.return_value = [("8080-8090", "tcp")]
+        fw_settings.queryPort.return_value = True
+
+        firewall_lib.main()
+        fw.queryPort.assert_called_once_with("default", "8081", "tcp")
+        fw_settings.queryPort.assert_called_once_with("8081", "tcp")
+        am.exit_json.assert_called_with(changed=False, __firewall_changed=False)
+
+        am.params["state"] = "disabled"
+        firewall_lib.main()
+        am.exit_json.assert_called_with(changed=True, __firewall_changed=True)
+
+        fw.addPort.assert_not_called()
+        fw_settings.addPort.assert_not_called()
+        fw.removePort.assert_not_called()
+        fw_settings.removePort.assert_not_called()
+
     @patch("firewall_lib.HAS_FIREWALLD", True)
     @patch("firewall_lib.FW_VERSION", "0.9.0", create=True)
     def test_allow_zone_drifting_runtime(self, am_class):
@@ -800,6 +1187,8 @@ class FirewallLibMain(unittest.TestCase):
         fw_config = Mock()
         fw_config.getZoneNames.return_value = available_zones
         fw.config.return_value = fw_config
+        fw_settings = fw_config.getZoneByName.return_value.getSettings.return_value
+        fw_settings.getInterfaces.return_value = []
 
         return_values = [(True, True), (True, False)]
         for state in ["enabled", "disabled"]:
@@ -1196,6 +1585,17 @@ def test_module_parameters(method, state, input, expected):
             called_mock_name = "remove" + method
         if "query_mock" in expected:
             query_mock = expected["query_mock"]
+        elif "current" in TEST_DATA[method]:
+            # zone entries are read once per resource, not queried per item
+            if state == "enabled":
+                current = []
+            else:
+                current = TEST_DATA[method]["current"]
+            # items missing from the snapshot are confirmed with a query
+            query_mock = {
+                "get" + method + "s.return_value": current,
+                "query" + method + ".return_value": False,
+            }
         elif state == "enabled":
             query_mock = {"query" + method + ".return_value": False}
         else:
@@ -1219,6 +1619,10 @@ def test_module_parameters(method, state, input, expected):
             rich_rule.configure_mock(**expected["rich_rule_mock"])
         firewall_lib.main()
         fw.setExceptionHandler.assert_called_once()
+        exception_handler = fw.setExceptionHandler.call_args[0][0]
+        with pytest.raises(MockException):
+            exception_handler("INVALID_ZONE")
+        am.fail_json.assert_called_with(msg="INVALID_ZONE")
         if runtime:
             called_mock = getattr(fw, called_mock_name)
             assert expected["runtime"] == called_mock.call_args_list